@@ -4,14 +4,17 @@
 # Purpose: Load transformed Titanic dataset into Supabase using Supabase client
  
 import os
+from functools import lru_cache
 import pandas as pd
 from supabase import create_client, Client
 from dotenv import load_dotenv
  
+load_dotenv()
+ 
 # Initialize Supabase client
+@lru_cache(maxsize=1)
 def get_supabase_client():
     """Initialize and return Supabase client."""
-    load_dotenv()
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_KEY")
    
@@ -99,15 +102,15 @@ def load_to_supabase(staged_path: str, table_name: str = "titanic_data"):
         batch_size = 50  # Reduced batch size for better reliability
         df = pd.read_csv(staged_path)
         total_rows = len(df)
+
+        # Convert NaN to None once for proper NULL handling, instead of per batch
+        df = df.astype(object).where(df.notna(), None)
        
         print(f"📊 Loading {total_rows} rows into '{table_name}'...")
        
         # Process in batches
         for i in range(0, total_rows, batch_size):
-            batch = df.iloc[i:i + batch_size].copy()
-            # Convert NaN to None for proper NULL handling
-            batch = batch.where(pd.notnull(batch), None)
-            records = batch.to_dict('records')
+            records = df.iloc[i:i + batch_size].to_dict('records')
            
             try:
                 response = supabase.table(table_name).insert(records).execute()
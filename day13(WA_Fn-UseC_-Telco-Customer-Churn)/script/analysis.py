@@ -1,29 +1,51 @@
 # analysis.py
 
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-from supabase import create_client
+import psycopg2
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 from dotenv import load_dotenv
+import matplotlib
+matplotlib.use("Agg")  # headless backend, safe to use from worker processes
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+load_dotenv()
 
-# ---------------- Supabase connection ----------------
-def get_supabase_client():
-    load_dotenv()
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_KEY")
-    if not url or not key:
-        raise ValueError("Missing SUPABASE_URL or SUPABASE_KEY in .env")
-    return create_client(url, key)
+
+# ---------------- Postgres connection ----------------
+def get_db_connection():
+    db_url = os.getenv("SUPABASE_DB_URL")
+    if not db_url:
+        raise ValueError("Missing SUPABASE_DB_URL in .env")
+    return psycopg2.connect(db_url)
 
 
 # ---------------- Fetch churn_data table ----------------
 def fetch_churn_data():
-    supabase = get_supabase_client()
-    result = supabase.table("churn_data").select("*").execute()
-    df = pd.DataFrame(result.data)
+    # Stream the table out as CSV and parse it with the multithreaded pyarrow reader
+    buf = io.BytesIO()
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert("COPY (SELECT * FROM churn_data) TO STDOUT WITH CSV HEADER", buf)
+    finally:
+        conn.close()
+    buf.seek(0)
+
+    # COPY writes NULL as an empty field; read those back as null, not ""
+    df = pv.read_csv(
+        buf, convert_options=pv.ConvertOptions(strings_can_be_null=True)
+    ).to_pandas()
     df.columns = df.columns.str.lower()  # lowercase columns
+
+    # Normalize churn once; metrics and plots then work on its int8 codes (No=0, Yes=1)
+    df['churn'] = pd.Categorical(
+        df['churn'].str.lower(), categories=['no', 'yes']
+    ).rename_categories(['No', 'Yes'])
     return df
 
 
@@ -31,67 +53,91 @@ def fetch_churn_data():
 def generate_metrics(df: pd.DataFrame):
     metrics = {}
 
+    # Category-code the contract column so its hash is computed once and reused below
+    df['contract'] = df['contract'].astype('category')
+
+    # One groupby over all categorical keys; every count metric is a marginal of it
+    keys = ['contract', 'tenure_group', 'internetservice', 'churn']
+    counts = df.groupby(keys, observed=True, dropna=False).size()
+
+    def marginal(*levels):
+        return counts.groupby(level=list(levels), observed=True).sum()
+
     # Churn percentage
-    churn_count = df['churn'].str.lower().value_counts().get('yes', 0)
+    churn_count = (df['churn'].cat.codes == 1).sum()
     metrics['churn_percentage'] = round((churn_count / len(df)) * 100, 2)
 
     # Average monthly charges per contract type
-    metrics['avg_monthly_charges_per_contract'] = df.groupby('contract')['monthlycharges'].mean().round(2).to_dict()
+    metrics['avg_monthly_charges_per_contract'] = df.groupby('contract', observed=True)['monthlycharges'].mean().round(2).to_dict()
 
     # Count of customers by tenure group
-    metrics['tenure_group_counts'] = df['tenure_group'].value_counts().to_dict()
+    metrics['tenure_group_counts'] = marginal('tenure_group').sort_values(ascending=False).to_dict()
 
     # Internet service distribution
-    metrics['internet_service_distribution'] = df['internetservice'].value_counts().to_dict()
+    metrics['internet_service_distribution'] = marginal('internetservice').sort_values(ascending=False).to_dict()
 
     # Pivot table: churn vs tenure group
-    pivot = pd.pivot_table(
-        df,
-        index='tenure_group',
-        columns='churn',
-        values='id',
-        aggfunc='count',
-        fill_value=0
-    )
+    pivot = marginal('tenure_group', 'churn').unstack('churn', fill_value=0)
     metrics['churn_vs_tenure_pivot'] = pivot
 
     return metrics
 
 
 # ---------------- Optional visualizations ----------------
-def generate_visualizations(df: pd.DataFrame, output_dir="..\\data\\processed\\figures"):
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Map churn to numeric for plotting
-    df['churn_numeric'] = df['churn'].map({'Yes': 1, 'No': 0})
-
+def _plot_monthly(df: pd.DataFrame, out: str):
     # Churn rate by monthly charge segment
     plt.figure(figsize=(6,4))
     sns.barplot(x='monthly_charge_segment', y='churn_numeric', data=df)
     plt.ylabel("Churn Rate")
     plt.title("Churn Rate by Monthly Charge Segment")
-    plt.savefig(os.path.join(output_dir, "churn_by_monthly_segment.png"))
+    plt.savefig(out)
     plt.close()
 
+
+def _plot_hist(df: pd.DataFrame, out: str):
     # Histogram of total charges
     plt.figure(figsize=(6,4))
     sns.histplot(df['totalcharges'].dropna(), bins=30, kde=True)
     plt.title("Histogram of TotalCharges")
     plt.xlabel("TotalCharges")
     plt.ylabel("Count")
-    plt.savefig(os.path.join(output_dir, "totalcharges_histogram.png"))
+    plt.savefig(out)
     plt.close()
 
+
+def _plot_contract(df: pd.DataFrame, out: str):
     # Bar plot of contract types
     plt.figure(figsize=(6,4))
     sns.countplot(x='contract', data=df)
     plt.title("Count of Contract Types")
     plt.xlabel("Contract")
     plt.ylabel("Count")
-    plt.savefig(os.path.join(output_dir, "contract_type_counts.png"))
+    plt.savefig(out)
     plt.close()
 
 
+def generate_visualizations(df: pd.DataFrame, output_dir="..\\data\\processed\\figures"):
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Churn category codes are already 0/1; -1 (unknown) is left out of the rate
+    codes = df['churn'].cat.codes
+    df['churn_numeric'] = codes.where(codes >= 0)
+
+    # Render each figure in its own process; only the columns a plot needs are pickled
+    jobs = [
+        (_plot_monthly, df[['monthly_charge_segment', 'churn_numeric']], "churn_by_monthly_segment.png"),
+        (_plot_hist, df[['totalcharges']], "totalcharges_histogram.png"),
+        (_plot_contract, df[['contract']], "contract_type_counts.png"),
+    ]
+    with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [
+            executor.submit(plot, data, os.path.join(output_dir, filename))
+            for plot, data, filename in jobs
+        ]
+        for future in futures:
+            future.result()  # re-raise any plotting error here
+
+
 # ---------------- Save summary CSV ----------------
 def save_summary_csv(df: pd.DataFrame, output_path="..\\data\\processed\\analysis_summary.csv"):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -110,9 +156,9 @@ if __name__ == "__main__":
     print(f"📊 Fetched {len(df)} rows.")
 
     # Warn if Supabase rows < local dataset
-    local_csv = os.path.join("..","data","staged","churn_transformed.csv")
-    if os.path.exists(local_csv):
-        local_rows = len(pd.read_csv(local_csv))
+    local_parquet = os.path.join("..","data","staged","churn_transformed.parquet")
+    if os.path.exists(local_parquet):
+        local_rows = pq.ParquetFile(local_parquet).metadata.num_rows  # footer only, no data read
         if len(df) < local_rows:
             print(f"⚠️ Warning: Supabase table has fewer rows ({len(df)}) than local dataset ({local_rows})")
 
@@ -1,19 +1,41 @@
 import os
-import pandas as pd
+import requests
 
 def extract_data():
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     data_dir = os.path.join(base_dir, "data", "raw")
     os.makedirs(data_dir, exist_ok=True)
 
+    raw_path = os.path.join(data_dir, "churn_raw.csv")
+    etag_path = raw_path + ".etag"
+
+    # Conditional GET: send the ETag of the cached copy, if we have one
+    headers = {}
+    if os.path.exists(raw_path) and os.path.exists(etag_path):
+        with open(etag_path) as f:
+            headers["If-None-Match"] = f.read().strip()
+
     # Download CSV from URL
     url = "https://raw.githubusercontent.com/IBM/telco-customer-churn-on-icp4d/master/data/Telco-Customer-Churn.csv"
-    df = pd.read_csv(url)
+    with requests.get(url, headers=headers, stream=True, timeout=30) as response:
+        if response.status_code == 304:
+            print(f"✅ Source unchanged, using cached data at: {raw_path}")
+            return raw_path
+        response.raise_for_status()
 
-    # Save to data/raw
-    raw_path = os.path.join(data_dir, "churn_raw.csv")
+        # Stream bytes straight to data/raw; swap in only once the download is complete
+        tmp_path = raw_path + ".part"
+        with open(tmp_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1 << 16):
+                f.write(chunk)
+        os.replace(tmp_path, raw_path)
 
-    df.to_csv(raw_path, index=False)
+        etag = response.headers.get("ETag")
+        if etag:
+            with open(etag_path, "w") as f:
+                f.write(etag)
+        elif os.path.exists(etag_path):
+            os.remove(etag_path)
 
     print(f"✅ Data extracted and saved at: {raw_path}")
     print("Raw path:",raw_path)
@@ -21,4 +43,3 @@ def extract_data():
 
 if __name__ == "__main__":
     extract_data()
-
@@ -1,10 +1,18 @@
+import asyncio
+import io
 import os
+from functools import lru_cache
+import httpx
+import orjson
 import pandas as pd
+import psycopg2
 from supabase import create_client
 from dotenv import load_dotenv
 
+load_dotenv()
+
+@lru_cache(maxsize=1)
 def get_supabase_client():
-    load_dotenv()
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_KEY")
 
@@ -13,6 +21,14 @@ def get_supabase_client():
 
     return create_client(url, key)
 
+def get_db_connection():
+    db_url = os.getenv("SUPABASE_DB_URL")
+
+    if not db_url:
+        raise ValueError("❌ Missing SUPABASE_DB_URL in .env file")
+
+    return psycopg2.connect(db_url)
+
 def create_table_if_not_exists():
     supabase = get_supabase_client()
 
@@ -42,6 +58,80 @@ def create_table_if_not_exists():
         print(f"⚠️ Error creating table: {e}")
         print("ℹ️ Ensure the PostgreSQL function 'execute_sql' exists")
 
+def copy_to_postgres(df: pd.DataFrame, table_name: str) -> bool:
+    # Serialize once to an in-memory CSV; empty fields become NULL in COPY
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False, na_rep="")
+    buf.seek(0)
+
+    total_rows = len(df)
+    copy_sql = (
+        f"COPY {table_name} ({', '.join(df.columns)}) "
+        "FROM STDIN WITH (FORMAT CSV, NULL '')"
+    )
+    print(f"📌 Uploading {total_rows} rows with COPY...")
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert(copy_sql, buf)
+        conn.commit()
+        print(f"✅ Inserted rows 1 ➝ {total_rows}")
+        return True
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ ERROR copying rows, transaction rolled back: {e}")
+        return False
+    finally:
+        conn.close()
+
+async def _post_batches(batches, rest_url, headers, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def post(client, start, end, body):
+        async with sem:
+            try:
+                response = await client.post(rest_url, headers=headers, content=body)
+                response.raise_for_status()
+                print(f"✅ Inserted rows {start + 1} ➝ {end}")
+                return True
+            except Exception as e:
+                print(f"❌ ERROR inserting rows {start + 1}-{end}: {e}")
+                return False
+
+    async with httpx.AsyncClient(timeout=30) as client:
+        results = await asyncio.gather(*(post(client, *batch) for batch in batches))
+    return all(results)
+
+def insert_via_rest(df: pd.DataFrame, table_name: str, batch_size=1000, concurrency=8) -> bool:
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_KEY")
+
+    if not url or not key:
+        raise ValueError("❌ Missing SUPABASE_URL or SUPABASE_KEY in .env file")
+
+    rest_url = f"{url.rstrip('/')}/rest/v1/{table_name}"
+    headers = {
+        "apikey": key,
+        "Authorization": f"Bearer {key}",
+        "Content-Type": "application/json",
+        "Prefer": "return=minimal"
+    }
+
+    # Pre-encode every batch as JSON bytes; orjson writes NaN as null. Rows keep their
+    # NumPy scalars so float32 values serialize as 29.85, not 29.850000381469727
+    columns = list(df.columns)
+    records = [dict(zip(columns, row)) for row in zip(*(df[col].to_numpy() for col in columns))]
+    total_rows = len(records)
+    batches = [
+        (start, min(start + batch_size, total_rows),
+         orjson.dumps(records[start:start + batch_size], option=orjson.OPT_SERIALIZE_NUMPY))
+        for start in range(0, total_rows, batch_size)
+    ]
+    print(f"📌 Uploading {total_rows} rows in batches of {batch_size} ({concurrency} concurrent)...")
+
+    return asyncio.run(_post_batches(batches, rest_url, headers, concurrency))
+
 def load_to_supabase(staged_path: str, table_name="churn_data"):
     if not os.path.isabs(staged_path):
         staged_path = os.path.abspath(staged_path)
@@ -52,7 +142,7 @@ def load_to_supabase(staged_path: str, table_name="churn_data"):
         print(f"❌ File not found at {staged_path}")
         return
 
-    df = pd.read_csv(staged_path)
+    df = pd.read_parquet(staged_path, engine="pyarrow")
     df.columns = df.columns.str.lower()  # lowercase column names
 
     # Keep only the 12 table columns
@@ -64,37 +154,22 @@ def load_to_supabase(staged_path: str, table_name="churn_data"):
     ]
     df = df[table_columns]
 
-    total_rows = len(df)
-    supabase = get_supabase_client()
-
-    batch_size = 200
-    print(f"📌 Uploading {total_rows} rows in batches of {batch_size}...")
-
-    for start in range(0, total_rows, batch_size):
-        batch = df.iloc[start:start + batch_size].copy()
-       # Convert NaN → None so Supabase accepts NULL
-        batch = batch.where(pd.notnull(batch), None)
-
-# Ensure integer columns are integers
-        int_columns = ["has_internet_service", "is_multi_line_user", "contract_type_code"]
-        for col in int_columns:
-            batch[col] = batch[col].astype(pd.Int64Dtype())  # safely convert to nullable integer
-
-
-        try:
-            supabase.table(table_name).insert(batch.to_dict("records")).execute()
-            print(f"✅ Inserted rows {start + 1} ➝ {min(start + batch_size, total_rows)}")
-        except Exception as e:
-            print(f"❌ ERROR inserting rows {start + 1}-{start + batch_size}: {e}")
+    # COPY needs a direct Postgres connection; otherwise overlap PostgREST batch inserts
+    if os.getenv("SUPABASE_DB_URL"):
+        loaded = copy_to_postgres(df, table_name)
+    else:
+        print("ℹ️ SUPABASE_DB_URL not set, falling back to PostgREST batch inserts")
+        loaded = insert_via_rest(df, table_name)
 
-    print(f"🎯 Data successfully loaded into table: {table_name}")
+    if loaded:
+        print(f"🎯 Data successfully loaded into table: {table_name}")
 
 if __name__ == "__main__":
-    staged_csv = os.path.join(
+    staged_path = os.path.join(
         os.path.dirname(os.path.abspath(__file__)),
-        "..", "data", "staged", "churn_transformed.csv"
+        "..", "data", "staged", "churn_transformed.parquet"
     )
-    staged_csv = os.path.abspath(staged_csv)
+    staged_path = os.path.abspath(staged_path)
 
     create_table_if_not_exists()
-    load_to_supabase(staged_csv)
+    load_to_supabase(staged_path)
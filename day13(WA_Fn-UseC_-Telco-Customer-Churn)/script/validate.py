@@ -1,25 +1,27 @@
+import io
 import os
 import pandas as pd
-from supabase import create_client
+import psycopg2
+import pyarrow.csv as pv
 from dotenv import load_dotenv
 
-def get_supabase_client():
-    load_dotenv()
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_KEY")
+load_dotenv()
 
-    if not url or not key:
-        raise ValueError("❌ Missing SUPABASE_URL or SUPABASE_KEY in .env file")
+def get_db_connection():
+    db_url = os.getenv("SUPABASE_DB_URL")
 
-    return create_client(url, key)
+    if not db_url:
+        raise ValueError("❌ Missing SUPABASE_DB_URL in .env file")
 
-def validate_data(local_csv_path: str, table_name="churn_data"):
-    if not os.path.exists(local_csv_path):
-        print(f"❌ File not found: {local_csv_path}")
+    return psycopg2.connect(db_url)
+
+def validate_data(local_path: str, table_name="churn_data"):
+    if not os.path.exists(local_path):
+        print(f"❌ File not found: {local_path}")
         return
 
     # Load original dataset
-    df = pd.read_csv(local_csv_path)
+    df = pd.read_parquet(local_path, engine="pyarrow")
     df.columns = df.columns.str.lower()
 
     # Keep only columns in Supabase table
@@ -50,18 +52,25 @@ def validate_data(local_csv_path: str, table_name="churn_data"):
     else:
         print(f"⚠️ Duplicate rows found: {total_rows_local - unique_rows}")
 
-    # Connect to Supabase
-    supabase = get_supabase_client()
-
-    # Fetch all rows from Supabase
-    result = supabase.table(table_name).select("*").execute()
-    data = result.data
-
-    if not data:
+    # Stream all rows out of Postgres as CSV
+    buf = io.BytesIO()
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert(f"COPY (SELECT * FROM {table_name}) TO STDOUT WITH CSV HEADER", buf)
+    finally:
+        conn.close()
+    buf.seek(0)
+
+    # COPY writes NULL as an empty field; read those back as null, not ""
+    df_supabase = pv.read_csv(
+        buf, convert_options=pv.ConvertOptions(strings_can_be_null=True)
+    ).to_pandas()
+
+    if df_supabase.empty:
         print("❌ Supabase table is empty")
         return
 
-    df_supabase = pd.DataFrame(data)
     total_rows_db = len(df_supabase)
     print(f"📌 Supabase table rows: {total_rows_db}")
 
@@ -88,8 +97,8 @@ def validate_data(local_csv_path: str, table_name="churn_data"):
     print("🎯 Validation completed ✅")
 
 if __name__ == "__main__":
-    local_csv = os.path.join(
+    local_path = os.path.join(
         os.path.dirname(os.path.abspath(__file__)),
-        "..", "data", "staged", "churn_transformed.csv"
+        "..", "data", "staged", "churn_transformed.parquet"
     )
-    validate_data(os.path.abspath(local_csv))
+    validate_data(os.path.abspath(local_path))
@@ -1,9 +1,9 @@
-import json
+import asyncio
 from pathlib import Path
 from datetime import datetime
-import requests
+import httpx
 import logging
-import time
+import orjson
 
 # ----------------------------
 # Folder setup
@@ -83,18 +83,18 @@ def fallback_traffic_data():
 # ---------------------------------------------------------
 # Helper: API request with retry
 # ---------------------------------------------------------
-def make_request(url, retries=3, wait=2):
+async def make_request(client, url, retries=3, wait=2):
     for attempt in range(1, retries + 1):
         try:
             print(f"⏳ Requesting: {url} (Attempt {attempt}/{retries})")
-            response = requests.get(url, timeout=10)
+            response = await client.get(url, timeout=10)
             response.raise_for_status()
             logging.info(f"SUCCESS - API responded: {url}")
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
             print(f"⚠️ Attempt {attempt} failed. Retrying...")
             logging.error(f"ERROR - API request failed: {url} | Error: {str(e)}")
-            time.sleep(wait)
+            await asyncio.sleep(wait)
 
     print(f"❌ API failed after {retries} retries. Using fallback data.")
     logging.warning(f"FALLBACK - Using dummy data for: {url}")
@@ -109,22 +109,22 @@ def make_request(url, retries=3, wait=2):
 # ---------------------------------------------------------
 # Extract Functions
 # ---------------------------------------------------------
-def extract_live_delivery_data():
-    data = make_request(DELIVERY_API)
+async def extract_live_delivery_data(client):
+    data = await make_request(client, DELIVERY_API)
 
     filename = RAW_DIR / f"live_delivery_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    filename.write_text(json.dumps(data, indent=2))
+    filename.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
     print(f"📦 Saved Live Delivery Data → {filename}")
     logging.info(f"RAW saved: {filename}")
     return str(filename)
 
 
-def extract_route_traffic_data():
-    data = make_request(TRAFFIC_API)
+async def extract_route_traffic_data(client):
+    data = await make_request(client, TRAFFIC_API)
 
     filename = RAW_DIR / f"route_traffic_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    filename.write_text(json.dumps(data, indent=2))
+    filename.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
     print(f"🚦 Saved Route Traffic Data → {filename}")
     logging.info(f"RAW saved: {filename}")
@@ -132,13 +132,20 @@ def extract_route_traffic_data():
 
 
 # ---------------------------------------------------------
-# Run both extractions
+# Run both extractions concurrently on one connection pool
 # ---------------------------------------------------------
+async def _extract_all_async():
+    async with httpx.AsyncClient() as client:
+        return await asyncio.gather(
+            extract_live_delivery_data(client),
+            extract_route_traffic_data(client)
+        )
+
+
 def extract_all():
     print("🚀 Starting Extraction Pipeline...")
 
-    d1 = extract_live_delivery_data()
-    d2 = extract_route_traffic_data()
+    d1, d2 = asyncio.run(_extract_all_async())
 
     print("\n✅ Extraction Completed Successfully!")
     return [d1, d2]